@@ -1,17 +1,26 @@
 #!/usr/bin/env python3
 import os
 
-import aws_cdk as cdk
+# Skip capturing construct stack traces to speed up synth. This must be set
+# before aws_cdk is imported, as the jsii runtime inherits the environment.
+os.environ.setdefault("CDK_DISABLE_STACK_TRACE", "1")
 
-from secure_api_with_cloudfront.secure_api_with_cloudfront_stack import (
+import aws_cdk as cdk  # noqa: E402
+
+from config import Config  # noqa: E402
+from secure_api_with_cloudfront.secure_api_with_cloudfront_stack import (  # noqa: E402
     SecureApiWithCloudfrontStack,
 )
 
 
+# Load config once and share it across stacks
+config = Config()
+
 app = cdk.App()
 SecureApiWithCloudfrontStack(
     app,
     "SecureApiWithCloudfrontStack",
+    config=config,
 )
 
 app.synth()
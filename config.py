@@ -1,5 +1,5 @@
 import os
-from dotenv import load_dotenv
+from typing import Optional
 
 
 class Config:
@@ -10,6 +10,9 @@ class Config:
         self._parse_environment_files()
 
         self._ssm_secure_parameter_name = os.getenv("SSM_SECURE_PARAMETER_NAME", None)
+        self._parameters_secrets_extension_arn = os.getenv(
+            "PARAMETERS_SECRETS_EXTENSION_ARN", None
+        )
 
     @property
     def ssm_secure_parameter_name(self) -> str:
@@ -19,8 +22,38 @@ class Config:
 
         return self._ssm_secure_parameter_name
 
+    @property
+    def parameters_secrets_extension_arn(self) -> Optional[str]:
+        """Get the Parameters and Secrets Lambda Extension layer ARN override."""
+        return self._parameters_secrets_extension_arn
+
     @staticmethod
     def _parse_environment_files() -> None:
-        """Load the .env file a."""
+        """Load the .env file into the environment without overriding existing vars."""
+
+        if not os.path.exists(".env"):
+            return
+
+        with open(".env", encoding="utf-8") as env_file:
+            for line in env_file:
+                line = line.strip()
+                if line.startswith("export "):
+                    line = line[len("export ") :].lstrip()
 
-        load_dotenv(".env", verbose=True)
+                key, separator, value = line.partition("=")
+                key = key.strip()
+                if not separator or not key or key.startswith("#"):
+                    continue
+
+                os.environ.setdefault(key, Config._parse_value(value))
+
+    @staticmethod
+    def _parse_value(value: str) -> str:
+        """Unquote a .env value, dropping inline comments outside of quotes."""
+        value = value.strip()
+        if value[:1] in ("'", '"'):
+            closing_quote = value.find(value[0], 1)
+            if closing_quote != -1:
+                return value[1:closing_quote]
+
+        return value.split(" #", 1)[0].strip()
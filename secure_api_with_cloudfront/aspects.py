@@ -0,0 +1,24 @@
+import jsii
+from aws_cdk import Annotations, IAspect, aws_apigateway as apigateway
+from constructs import IConstruct
+
+
+@jsii.implements(IAspect)
+class RegionalEndpointChecker:
+    """Fail synth if a REST API is not deployed with a REGIONAL endpoint.
+
+    CloudFront already fronts the API, so an EDGE endpoint would add a second
+    CloudFront hop to every request.
+    """
+
+    def visit(self, node: IConstruct) -> None:
+        """Check the endpoint configuration of every CfnRestApi."""
+        if not isinstance(node, apigateway.CfnRestApi):
+            return
+
+        endpoint_configuration = node.endpoint_configuration
+        types = getattr(endpoint_configuration, "types", None) or []
+        if apigateway.EndpointType.REGIONAL.value not in types:
+            Annotations.of(node).add_error(
+                "REST API must use a REGIONAL endpoint when served through CloudFront."
+            )
@@ -0,0 +1,77 @@
+import compileall
+import py_compile
+import shlex
+import shutil
+import sys
+
+import jsii
+from aws_cdk import BundlingOptions, ILocalBundling, aws_lambda as _lambda
+
+# Files not needed at runtime, kept out of the lambda assets. Every entry is a
+# file or directory name pattern, so the same list works for CDK's asset
+# fingerprint, shutil.ignore_patterns and find -name.
+LAMBDA_ASSET_EXCLUDE = [
+    "__pycache__",
+    "*.pyc",
+    "*.pyo",
+    "tests",
+    "*.md",
+    ".pytest_cache",
+]
+
+_FIND_EXCLUDED = " -o ".join(
+    f"-name {shlex.quote(pattern)}" for pattern in LAMBDA_ASSET_EXCLUDE
+)
+# Bytecode is written with unchecked-hash invalidation so it stays valid
+# regardless of the file timestamps in the deployment package.
+DOCKER_BUNDLING_COMMAND = (
+    "cp -r /asset-input/. /asset-output/"
+    f" && find /asset-output -mindepth 1 \\( {_FIND_EXCLUDED} \\) -prune -exec rm -rf {{}} +"
+    " && python -m compileall -q -f --invalidation-mode unchecked-hash /asset-output"
+)
+
+
+@jsii.implements(ILocalBundling)
+class LocalBytecodeBundling:
+    """Bundle a lambda source directory on the host when it runs Python 3.12.
+
+    Falls back to Docker bundling on any other interpreter, as the bytecode
+    must match the lambda runtime.
+    """
+
+    def __init__(self, source_dir: str) -> None:
+        """Initialize with the lambda source directory."""
+        self._source_dir = source_dir
+
+    def try_bundle(self, output_dir: str, options: BundlingOptions) -> bool:
+        """Copy the sources without excluded files and compile them."""
+        if sys.version_info[:2] != (3, 12):
+            return False
+
+        shutil.copytree(
+            self._source_dir,
+            output_dir,
+            ignore=shutil.ignore_patterns(*LAMBDA_ASSET_EXCLUDE),
+            dirs_exist_ok=True,
+        )
+        return bool(
+            compileall.compile_dir(
+                output_dir,
+                quiet=1,
+                force=True,
+                invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH,
+            )
+        )
+
+
+def lambda_asset_code(directory: str) -> _lambda.Code:
+    """Package a lambda source directory with precompiled bytecode."""
+    return _lambda.Code.from_asset(
+        directory,
+        exclude=LAMBDA_ASSET_EXCLUDE,
+        bundling=BundlingOptions(
+            image=_lambda.Runtime.PYTHON_3_12.bundling_image,
+            command=["bash", "-c", DOCKER_BUNDLING_COMMAND],
+            local=LocalBytecodeBundling(directory),
+        ),
+    )
@@ -1,28 +1,108 @@
 from aws_cdk import (
+    Annotations,
+    Aspects,
     Stack,
     Duration,
+    Size,
     CfnOutput,
+    CustomResource,
+    RemovalPolicy,
     aws_lambda as _lambda,
     aws_iam as iam,
     aws_ssm as ssm,
     aws_apigateway as apigateway,
     aws_cloudfront as cloudfront,
     aws_cloudfront_origins as origins,
-    custom_resources as cr,
+    aws_events as events,
+    aws_events_targets as events_targets,
 )
-import aws_cdk.aws_scheduler_alpha as scheduler
-import aws_cdk.aws_scheduler_targets_alpha as targets
+import json
+from typing import Optional
+
 from constructs import Construct
 from config import Config
+from secure_api_with_cloudfront.aspects import RegionalEndpointChecker
+from secure_api_with_cloudfront.bundling import lambda_asset_code
+
+# AWS Parameters and Secrets Lambda Extension (Arm64), formatted with the region
+PARAMETERS_SECRETS_EXTENSION_ARN = (
+    "arn:aws:lambda:{region}:177933569100:layer:"
+    "AWS-Parameters-and-Secrets-Lambda-Extension-Arm64:11"
+)
+
+
+# Inline handler for the custom resource that invokes a target lambda function
+# asynchronously on stack create and update
+INVOKE_ON_CREATE_HANDLER = """
+import json
+import os
+
+import boto3
+import cfnresponse
+
+lambda_client = boto3.client("lambda")
+PHYSICAL_RESOURCE_ID = "UpdateSecureHeaderOnCreateCustomResource"
+
+
+def lambda_handler(event, context):
+    try:
+        if event["RequestType"] in ("Create", "Update"):
+            lambda_client.invoke(
+                FunctionName=os.environ["TARGET_FUNCTION_NAME"],
+                InvocationType="Event",
+                Payload=json.dumps({"RequestType": "Create"}),
+            )
+        cfnresponse.send(
+            event, context, cfnresponse.SUCCESS, {}, PHYSICAL_RESOURCE_ID
+        )
+    except Exception as e:
+        print("Failed to invoke target function:", e)
+        cfnresponse.send(event, context, cfnresponse.FAILED, {}, PHYSICAL_RESOURCE_ID)
+"""
+
+# CORS settings shared by the preflight function and the response headers policy
+CORS_ALLOW_ORIGINS = ["*"]
+CORS_ALLOW_METHODS = ["GET", "HEAD", "OPTIONS"]
+CORS_ALLOW_HEADERS = ["*"]
+CORS_MAX_AGE = Duration.seconds(600)
+
+# CloudFront function answering CORS preflight requests at the edge
+CORS_PREFLIGHT_HANDLER = """
+function handler(event) {
+    var request = event.request;
+    if (request.method !== "OPTIONS") {
+        return request;
+    }
+
+    return {
+        statusCode: 204,
+        statusDescription: "No Content",
+        headers: %s,
+    };
+}
+""" % json.dumps(
+    {
+        "access-control-allow-origin": {"value": ", ".join(CORS_ALLOW_ORIGINS)},
+        "access-control-allow-methods": {"value": ", ".join(CORS_ALLOW_METHODS)},
+        "access-control-allow-headers": {"value": ", ".join(CORS_ALLOW_HEADERS)},
+        "access-control-max-age": {"value": str(int(CORS_MAX_AGE.to_seconds()))},
+    }
+)
 
 
 class SecureApiWithCloudfrontStack(Stack):
 
-    def __init__(self, scope: Construct, construct_id: str, **kwargs) -> None:
+    def __init__(
+        self,
+        scope: Construct,
+        construct_id: str,
+        config: Optional[Config] = None,
+        **kwargs,
+    ) -> None:
         super().__init__(scope, construct_id, **kwargs)
 
-        # Load config
-        config = Config()
+        # Load config unless one is shared by the app
+        config = config or Config()
 
         custom_header_key = "token-from-cloudfront"
 
@@ -38,23 +118,58 @@ class SecureApiWithCloudfrontStack(Stack):
             self,
             "BackendFunction",
             runtime=_lambda.Runtime.PYTHON_3_12,
+            architecture=_lambda.Architecture.ARM_64,
+            memory_size=512,
+            ephemeral_storage_size=Size.mebibytes(512),
             handler="index.lambda_handler",
-            code=_lambda.Code.from_asset("src/backend_function"),
+            code=lambda_asset_code("src/backend_function"),
             timeout=Duration.seconds(2),
         )
 
+        # Caches the ssm parameter for the custom authorizer
+        parameters_secrets_extension = _lambda.LayerVersion.from_layer_version_arn(
+            self,
+            "ParametersSecretsExtension",
+            config.parameters_secrets_extension_arn
+            or PARAMETERS_SECRETS_EXTENSION_ARN.format(region=self.region),
+        )
+
         # Custom authorizer lambda function
         custom_authorizer = _lambda.Function(
             self,
             "BackendLambdaFunction",
             runtime=_lambda.Runtime.PYTHON_3_12,
+            architecture=_lambda.Architecture.ARM_64,
+            memory_size=512,
+            ephemeral_storage_size=Size.mebibytes(512),
             handler="index.lambda_handler",
-            code=_lambda.Code.from_asset("src/custom_authorizer"),
+            code=lambda_asset_code("src/custom_authorizer"),
+            layers=[parameters_secrets_extension],
             timeout=Duration.seconds(2),
             environment={
                 "SSM_PARAMETER_NAME": secure_parameter.parameter_name,
                 "CUSTOM_HEADER_KEY": custom_header_key,
+                # Kept well below the authorizer results cache TTL
+                "SSM_PARAMETER_STORE_TTL": "60",
             },
+            snap_start=_lambda.SnapStartConf.ON_PUBLISHED_VERSIONS,
+            # Only keep the version behind the alias, older snapshots are not billed
+            current_version_options=_lambda.VersionOptions(
+                removal_policy=RemovalPolicy.DESTROY
+            ),
+        )
+
+        # SnapStart only applies to published versions, so the authorizer uses an alias
+        custom_authorizer_alias = _lambda.Alias(
+            self,
+            "CustomAuthorizerAlias",
+            alias_name="live",
+            version=custom_authorizer.current_version,
+        )
+
+        Annotations.of(custom_authorizer).acknowledge_warning(
+            "@aws-cdk/aws-lambda:snapStartRequirePublish",
+            "current_version is published and invoked through the live alias.",
         )
 
         custom_authorizer.add_to_role_policy(
@@ -71,12 +186,11 @@ class SecureApiWithCloudfrontStack(Stack):
             rest_api_name="MyRestApi",
             description="My Rest Api",
             endpoint_types=[apigateway.EndpointType.REGIONAL],
-            default_cors_preflight_options=apigateway.CorsOptions(
-                allow_origins=apigateway.Cors.ALL_ORIGINS,
-                allow_methods=apigateway.Cors.ALL_METHODS,
-            ),
         )
 
+        # Keep the API REGIONAL to avoid a second CloudFront hop
+        Aspects.of(self).add(RegionalEndpointChecker())
+
         apigw_lambda_execution_role = iam.Role(
             self,
             "LambdaExecutionRole",
@@ -98,7 +212,7 @@ class SecureApiWithCloudfrontStack(Stack):
         authorizer = apigateway.RequestAuthorizer(
             self,
             "LambdaHeaderAuthorizer",
-            handler=custom_authorizer,
+            handler=custom_authorizer_alias,
             identity_sources=[apigateway.IdentitySource.header(custom_header_key)],
             results_cache_ttl=Duration.minutes(5),
         )
@@ -116,6 +230,41 @@ class SecureApiWithCloudfrontStack(Stack):
             authorizer=authorizer,
         )
 
+        # Short lived cache for /hello to collapse repeated hits to the origin
+        hello_cache_policy = cloudfront.CachePolicy(
+            self,
+            "HelloCachePolicy",
+            default_ttl=Duration.seconds(5),
+            min_ttl=Duration.seconds(1),
+            max_ttl=Duration.seconds(30),
+            query_string_behavior=cloudfront.CacheQueryStringBehavior.none(),
+            header_behavior=cloudfront.CacheHeaderBehavior.none(),
+            cookie_behavior=cloudfront.CacheCookieBehavior.none(),
+            enable_accept_encoding_gzip=True,
+            enable_accept_encoding_brotli=True,
+        )
+
+        # CORS is handled at CloudFront, so preflight requests never reach the API
+        cors_response_headers_policy = cloudfront.ResponseHeadersPolicy(
+            self,
+            "CorsResponseHeadersPolicy",
+            cors_behavior=cloudfront.ResponseHeadersCorsBehavior(
+                access_control_allow_origins=CORS_ALLOW_ORIGINS,
+                access_control_allow_methods=CORS_ALLOW_METHODS,
+                access_control_allow_headers=CORS_ALLOW_HEADERS,
+                access_control_allow_credentials=False,
+                access_control_max_age=CORS_MAX_AGE,
+                origin_override=True,
+            ),
+        )
+
+        cors_preflight_function = cloudfront.Function(
+            self,
+            "CorsPreflightFunction",
+            code=cloudfront.FunctionCode.from_inline(CORS_PREFLIGHT_HANDLER),
+            runtime=cloudfront.FunctionRuntime.JS_2_0,
+        )
+
         # Create a cloudfront distribution to host the frontend
         cloudfront_distribution = cloudfront.Distribution(
             self,
@@ -127,19 +276,63 @@ class SecureApiWithCloudfrontStack(Stack):
                     custom_headers={custom_header_key: "test"},
                 ),
                 viewer_protocol_policy=cloudfront.ViewerProtocolPolicy.REDIRECT_TO_HTTPS,
-                cache_policy=cloudfront.CachePolicy.CACHING_DISABLED,
+                cache_policy=hello_cache_policy,
                 allowed_methods=cloudfront.AllowedMethods.ALLOW_GET_HEAD_OPTIONS,
+                # CloudFront only compresses when the cache policy caches with
+                # gzip/brotli accept-encoding enabled (hello_cache_policy does)
+                # and the response body is at least 1,000 bytes. The current
+                # /hello body is smaller, so this has no effect on it yet.
+                compress=True,
+                response_headers_policy=cors_response_headers_policy,
+                function_associations=[
+                    cloudfront.FunctionAssociation(
+                        function=cors_preflight_function,
+                        event_type=cloudfront.FunctionEventType.VIEWER_REQUEST,
+                    )
+                ],
             ),
             price_class=cloudfront.PriceClass.PRICE_CLASS_200,
         )
 
+        update_secure_header_role = iam.Role(
+            self,
+            "UpdateSecureHeaderRole",
+            assumed_by=iam.ServicePrincipal("lambda.amazonaws.com"),
+            description="Role for the update secure header lambda function.",
+            managed_policies=[
+                iam.ManagedPolicy.from_aws_managed_policy_name(
+                    "service-role/AWSLambdaBasicExecutionRole"
+                )
+            ],
+            inline_policies={
+                "UpdateSecureHeaderPermissions": iam.PolicyDocument(
+                    statements=[
+                        iam.PolicyStatement(
+                            actions=["ssm:GetParameter", "ssm:PutParameter"],
+                            resources=[secure_parameter.parameter_arn],
+                        ),
+                        iam.PolicyStatement(
+                            actions=[
+                                "cloudfront:GetDistributionConfig",
+                                "cloudfront:UpdateDistribution",
+                            ],
+                            resources=[cloudfront_distribution.distribution_arn],
+                        ),
+                    ]
+                ),
+            },
+        )
+
         # Update cloudfront distribution with the secure header
         update_secure_header = _lambda.Function(
             self,
             "UpdateSecureHeaderFunction",
             runtime=_lambda.Runtime.PYTHON_3_12,
+            architecture=_lambda.Architecture.ARM_64,
+            memory_size=256,
+            ephemeral_storage_size=Size.mebibytes(512),
             handler="index.lambda_handler",
-            code=_lambda.Code.from_asset("src/update_secure_header"),
+            code=lambda_asset_code("src/update_secure_header"),
             timeout=Duration.seconds(5),
             environment={
                 "SSM_PARAMETER_NAME": secure_parameter.parameter_name,
@@ -147,81 +340,42 @@ class SecureApiWithCloudfrontStack(Stack):
                 "APIGATEWAY_URL": rest_api.url,
                 "CUSTOM_HEADER_KEY": custom_header_key,
             },
+            role=update_secure_header_role,
         )
 
-        update_secure_header.add_to_role_policy(
-            iam.PolicyStatement(
-                actions=["ssm:GetParameter", "ssm:PutParameter"],
-                resources=[secure_parameter.parameter_arn],
-            )
-        )
-
-        update_secure_header.add_to_role_policy(
-            iam.PolicyStatement(
-                actions=[
-                    "cloudfront:GetDistributionConfig",
-                    "cloudfront:UpdateDistribution",
-                ],
-                resources=[cloudfront_distribution.distribution_arn],
-            )
-        )
-
-        # IAM Role for custom resource
-        custom_resource_role = iam.Role(
-            scope=self,
-            id="CustomResourceRole",
-            assumed_by=iam.ServicePrincipal("lambda.amazonaws.com"),
+        # Inline lambda function backing the custom resource
+        invoke_on_create_function = _lambda.Function(
+            self,
+            "InvokeOnCreateFunction",
+            runtime=_lambda.Runtime.PYTHON_3_12,
+            architecture=_lambda.Architecture.ARM_64,
+            handler="index.lambda_handler",
+            code=_lambda.Code.from_inline(INVOKE_ON_CREATE_HANDLER),
+            timeout=Duration.seconds(30),
+            environment={
+                "TARGET_FUNCTION_NAME": update_secure_header.function_name,
+            },
         )
 
-        custom_resource_role.add_to_policy(
-            iam.PolicyStatement(
-                actions=["lambda:InvokeFunction"],
-                resources=[update_secure_header.function_arn],
-            )
-        )
+        update_secure_header.grant_invoke(invoke_on_create_function)
 
         # Custom resource to update the secure header on stack create
-        cr.AwsCustomResource(
+        CustomResource(
             self,
             "UpdateSecureHeaderOnCreateCustomResource",
-            on_update=cr.AwsSdkCall(
-                service="lambda",
-                action="Invoke",
-                physical_resource_id=cr.PhysicalResourceId.of(
-                    "UpdateSecureHeaderOnCreateCustomResource"
-                ),
-                parameters={
-                    "FunctionName": update_secure_header.function_name,
-                    "InvocationType": "Event",
-                    "Payload": '{"RequestType": "Create"}',
-                },
-            ),
-            policy=cr.AwsCustomResourcePolicy.from_sdk_calls(
-                resources=cr.AwsCustomResourcePolicy.ANY_RESOURCE
-            ),
-            role=custom_resource_role,
-        )
-
-        # AWS EventBridge scheduler to update the secure header every 6 hours
-        scheduler_role = iam.Role(
-            self,
-            "SchedulerRole",
-            assumed_by=iam.ServicePrincipal("scheduler.amazonaws.com"),
-        )
-
-        scheduler_role.add_to_policy(
-            iam.PolicyStatement(
-                actions=["lambda:InvokeFunction"],
-                resources=[update_secure_header.function_arn],
-            )
+            service_token=invoke_on_create_function.function_arn,
+            properties={
+                "TargetFunctionName": update_secure_header.function_name,
+            },
         )
 
-        scheduler.Schedule(
+        # AWS EventBridge rule to update the secure header every 6 hours
+        events.Rule(
             self,
-            "Schedule",
-            schedule=scheduler.ScheduleExpression.rate(Duration.hours(6)),
-            target=targets.LambdaInvoke(update_secure_header, role=scheduler_role),
-            description="Schedule to trigger update header lambda function every 6 hours.",
+            "UpdateHeaderRule",
+            schedule=events.Schedule.rate(Duration.hours(6)),
+            targets=[events_targets.LambdaFunction(update_secure_header)],
+            description="Rule to trigger update header lambda function every 6 hours.",
         )
 
         # Output
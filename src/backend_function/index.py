@@ -1,17 +1,12 @@
-import json
 import datetime
 
 
 def lambda_handler(event, context):
-    current_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    current_time = datetime.datetime.now().isoformat(sep=" ", timespec="seconds")
+    # Body only contains a fixed message and a timestamp, so no json.dumps needed
+    body = '{"message": "Data from API served by Lambda - ' + current_time + '"}'
+    # CORS headers are added by CloudFront
     return {
         "statusCode": 200,
-        "body": json.dumps(
-            {"message": f"Data from API served by Lambda - {current_time}"}
-        ),
-        "headers": {
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Methods": "OPTIONS, POST",
-            "Access-Control-Allow-Headers": "Content-Type",
-        },
+        "body": body,
     }
@@ -1,22 +1,64 @@
+import json
 import os
+import urllib.parse
+import urllib.request
+
 import boto3
 
-ssm = boto3.client("ssm")
+ssm = None
 SSM_PARAMETER_NAME = os.environ["SSM_PARAMETER_NAME"]
 CUSTOM_HEADER_KEY = os.environ["CUSTOM_HEADER_KEY"]
+# Served by the AWS Parameters and Secrets Lambda Extension, which caches values
+EXTENSION_PORT = os.environ.get("PARAMETERS_SECRETS_EXTENSION_HTTP_PORT", "2773")
+PARAMETER_URL = (
+    f"http://localhost:{EXTENSION_PORT}/systemsmanager/parameters/get"
+    f"?name={urllib.parse.quote(SSM_PARAMETER_NAME, safe='')}&withDecryption=true"
+)
+
 
 def fetch_header_value():
+    # Returns None if the extension cannot serve the value, so callers fall back
+    # to reading SSM directly instead of failing the request.
+    try:
+        request = urllib.request.Request(
+            PARAMETER_URL,
+            headers={
+                "X-Aws-Parameters-Secrets-Token": os.environ["AWS_SESSION_TOKEN"]
+            },
+        )
+        with urllib.request.urlopen(request, timeout=1) as response:
+            return json.loads(response.read())["Parameter"]["Value"]
+    # OSError covers urllib.error.URLError, HTTPError and read timeouts
+    except (OSError, KeyError, ValueError) as e:
+        print("Failed to read header value from extension:", e)
+        return None
+
+
+def fetch_latest_header_value():
+    # Bypasses the extension cache, which can still hold the value from before a
+    # rotation. The client is created on first use so SnapStart restores do not
+    # reuse credentials captured in the snapshot.
+    global ssm
+    if ssm is None:
+        ssm = boto3.client("ssm")
     response = ssm.get_parameter(Name=SSM_PARAMETER_NAME, WithDecryption=True)
     return response["Parameter"]["Value"]
 
 
+def stage_resource_arn(method_arn):
+    # arn:aws:execute-api:region:account:api-id/stage/verb/path -> api-id/stage/*
+    api_id_and_stage = method_arn.split("/", 2)[:2]
+    return "/".join(api_id_and_stage) + "/*"
+
+
 def lambda_handler(event, context):
     headers = event.get("headers", {})
     api_key = headers.get(CUSTOM_HEADER_KEY, None)
-    expected_key = fetch_header_value()
 
     effect = "Deny"
-    if api_key == expected_key:
+    if api_key is not None and (
+        api_key == fetch_header_value() or api_key == fetch_latest_header_value()
+    ):
         effect = "Allow"
 
     return {
@@ -27,7 +69,7 @@ def lambda_handler(event, context):
                 {
                     "Action": "execute-api:Invoke",
                     "Effect": effect,
-                    "Resource": event["methodArn"],
+                    "Resource": stage_resource_arn(event["methodArn"]),
                 }
             ],
         },